@@ -64,6 +64,12 @@ class CachedProperty(CustomProperty[T], Generic[T, Ow]):
     def __get__(self, obj: Optional[Ow], cls: Type[Ow]): # type: ignore[override]
         if obj is None:
             return self
+        # Subclassing property makes this a data descriptor, so the
+        # instance attribute doesn't shadow it and needs to be checked here
+        try:
+            return obj.__dict__[self.property_name]
+        except KeyError:
+            pass
         value = obj.__dict__[self.property_name] = self.func(obj)
         return value
 
@@ -76,41 +82,58 @@ class SettableCachedProperty(CachedProperty[T, O]):
         obj.__dict__[self.property_name] = value
 
 
+def _identity(x):
+    return x
+
+
 class DictPathRoProperty(CustomProperty[T]):
     _NoDefault = NewType("_NoDefault", object)
     _nodefault = _NoDefault(object())
 
     def __init__(self, source_member: str, path: Sequence[str],
-            default: Union[T, _NoDefault]=_nodefault, type: Callable[[Any], T]=lambda x: x):
+            default: Union[T, _NoDefault]=_nodefault, type: Callable[[Any], T]=_identity):
         self.source_member = source_member
         self.path = path
         self.default = default
         self.type = type
+        self._get_value = self._compile_getter(source_member, path)
+        # Skip the conversion call entirely for untyped properties
+        self._convert = None if type is _identity else type
+
+    @staticmethod
+    def _compile_getter(source_member: str, path: Sequence[str]) -> Callable[[Any], Any]:
+        """ Generate an accessor with the path unrolled, so reads don't loop over it """
+        if not source_member.isidentifier():
+            source = "getattr(obj, %r)" % source_member
+        else:
+            source = "obj.%s" % source_member
+        ns: dict = {}
+        exec("def get(obj):\n    return %s%s\n" % (source, "".join("[%r]" % pc for pc in path)), ns)
+        return ns["get"]
 
     def _get_parent(self, obj: O, *, create=False) -> MutableMapping[str, Any]:
         d: MutableMapping[str, Any] = getattr(obj, self.source_member)
-        for pc in self.path[:-1]:
-            try:
+        if create:
+            for pc in self.path[:-1]:
+                d = d.setdefault(pc, {})
+        else:
+            for pc in self.path[:-1]:
                 d = d[pc]
-            except KeyError:
-                if not create:
-                    raise
-                nd: MutableMapping[str, Any] = {}
-                d[pc] = nd
-                d = nd
         return d
 
     def __get__(self, obj: Optional[O], cls: Type[O]): # type: ignore
         if obj is None:
             return self
         try:
-            val = self._get_parent(obj)[self.path[-1]]
+            val = self._get_value(obj)
         except KeyError:
             if self.default is not self._nodefault:
                 return self.default
             raise
         else:
-            return self.type(val)
+            if self._convert is None:
+                return val
+            return self._convert(val)
 
 
 class DictPathProperty(DictPathRoProperty[T]):
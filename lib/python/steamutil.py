@@ -3,20 +3,150 @@
 
 import datetime
 import fnmatch
+import functools
+import mmap
 import os
+import pickle
 import re
 import sys
+import tempfile
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Iterable, Dict, Literal, Mapping, Tuple, Optional, Union, Any, cast, overload
+from typing import Callable, Deque, List, Iterable, Dict, FrozenSet, Literal, Mapping, Tuple, Optional, TypeVar, Union, Any, cast, overload
 
 from vdfparser import VdfParser, DeepDict, AppInfoFile, LowerCaseNormalizingDict, dd_getpath
-from propex import SettableCachedProperty, DictPathProperty, DictPathRoProperty, cached_property
+from propex import DictPathProperty, DictPathRoProperty, cached_property
 
 
 _vdf = VdfParser()
 _vdf_ci = VdfParser(factory=LowerCaseNormalizingDict)
 
+_re_metachars = re.compile(r"[.^$*+?{}\[\]\\|()]")
+_re_globchars = re.compile(r"[*?\[]")
+
+
+T = TypeVar("T")
+
+
+def _cache_dir() -> Optional[Path]:
+    """ On-disk cache location. Persistent caching is opt-in via STEAMUTIL_CACHE_DIR """
+    path = os.environ.get("STEAMUTIL_CACHE_DIR")
+    return Path(path).expanduser() if path else None
+
+
+def _cached_by_mtime(name: str, source: Path, compute: Callable[[], T]) -> T:
+    """ Memoize compute() on disk across runs, keyed by the source file path and mtime """
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return compute()
+    cache_path = cache_dir / (name + ".pickle")
+    key = os.fspath(source)
+    mtime = os.stat(source).st_mtime_ns
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, pickle.UnpicklingError, EOFError):
+        cache = {}
+    entry = cache.get(key)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    value = compute()
+    cache[key] = (mtime, value)
+    temp_path = None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Unique temporary name, concurrent processes may update the cache at the same time
+        with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=name, suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            pickle.dump(cache, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if temp_path is not None:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+    return value
+
+
+def _tree_size(path: str) -> int:
+    """ Sum the sizes of all files below path, without following symlinks """
+    total = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                else:
+                    total += e.stat(follow_symlinks=False).st_size
+    return total
+
+
+def _load_vdf(path: Union[str, os.PathLike], parser: VdfParser=_vdf) -> DeepDict:
+    """ Parse a VDF file, reading it in one go instead of through a small text buffer """
+    with open(path, "rb") as f:
+        # mmap refuses empty files
+        if os.fstat(f.fileno()).st_size == 0:
+            return parser.parse_string("")
+        # Decode straight from the mapping, without an intermediate bytes copy
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return parser.parse_string(str(mm, "utf-8"))
+
+
+ManifestMatcher = Callable[[mmap.mmap], bool]
+
+
+@functools.lru_cache(maxsize=256)
+def _regex_name_matcher(regexp: str) -> Callable[[str], bool]:
+    """ Match lower-cased app names against a regex """
+    if _re_metachars.search(regexp) is None:
+        # Plain name, no need for the regex engine
+        needle = regexp.lower()
+        return lambda name: needle in name
+    reg = re.compile(regexp, re.IGNORECASE)
+    return lambda name: reg.search(name) is not None
+
+
+@functools.lru_cache(maxsize=256)
+def _glob_name_matcher(pattern: str) -> Callable[[str], bool]:
+    """ Match lower-cased app names containing a shell glob pattern """
+    if _re_globchars.search(pattern) is None:
+        # Plain name, no need for pattern matching
+        needle = pattern.lower()
+        return lambda name: needle in name
+    glob = "*%s*" % pattern.lower()
+    return lambda name: fnmatch.fnmatchcase(name, glob)
+
+
+def _manifest_name_matcher(match: Callable[[str], bool]) -> ManifestMatcher:
+    """ Match the lower-cased manifest name, without running the regex engine over the whole file """
+    def match_manifest(mm: mmap.mmap) -> bool:
+        start = mm.find(b'"name"')
+        if start < 0:
+            return False
+        end = mm.find(b"\n", start)
+        # "name" <ws> "value" -> ['', <ws>, 'value', ...]
+        parts = mm[start + 6:end if end >= 0 else len(mm)].split(b'"')
+        return len(parts) > 2 and match(parts[1].decode("utf-8").lower())
+    return match_manifest
+
+
+def _scan_manifest(path: Union[str, os.PathLike], match: ManifestMatcher) -> Optional[str]:
+    """ Search a manifest without decoding it, returning its text only on a match """
+    with open(path, "rb") as f:
+        # mmap refuses empty files
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if not match(mm):
+                return None
+            return str(mm, "utf-8")
+
 
 class MalformedManifestError(Exception):
     @property
@@ -25,6 +155,9 @@ class MalformedManifestError(Exception):
 
 
 class AppInfo:
+    # Keep __dict__ for the cached properties
+    __slots__ = "steam", "appid", "__dict__"
+
     steam: 'Steam'
     appid: int
 
@@ -50,11 +183,14 @@ class AppInfo:
         return self.appinfo["appinfo"]["config"]["launch"].values()
 
     name        = DictPathRoProperty[Optional[str]]("appinfo", ("appinfo", "common", "name"), default=None)
-    oslist      = DictPathRoProperty[List[str]]    ("appinfo", ("appinfo", "common", "oslist"), type=lambda s: s.split(","))
     install_dir = DictPathRoProperty[Optional[str]]("appinfo", ("appinfo", "config", "installdir"), default=None)
     languages   = DictPathRoProperty[Any]          ("appinfo", ("appinfo", "common", "supported_languages"))
     gameid      = DictPathRoProperty[int]          ("appinfo", ("appinfo", "common", "gameid"), type=int)
 
+    @cached_property
+    def oslist(self) -> FrozenSet[str]:
+        return frozenset(dd_getpath(self.appinfo, ("appinfo", "common", "oslist"), t=str).split(","))
+
     # Misc.
     def get_userdata_path(self, user_id: Union[int, 'LoginUser']) -> Path:
         return self.steam.get_userdata_path(user_id) / str(self.appid)
@@ -67,50 +203,61 @@ class AppInfo:
     @cached_property
     def compat_tool(self) -> dict:
         """ The compatibility tool selected for this app.
-        Note: this will still return a default if no tool is used
+        Note: this will still return a default if no tool is used.
+        The default dict is shared between apps, copy it before modifying.
         """
-        mapping = self.steam.compat_tool_mapping
+        mapping = self.steam._compat_tool_mapping
         appid = str(self.appid)
         # User override
-        if appid in mapping and mapping[appid]["name"]:
-            tool = dict(mapping[appid])
+        entry = mapping.get(appid)
+        if entry is not None and entry.get("name"):
+            tool = dict(entry)
             tool["source"] = "user"
             return tool
         # Steam play manifest
-        manifest = self.steam.steamplay_manifest["extended"]["app_mappings"]
-        if appid in manifest:
-            tool = dict(manifest[appid])
+        entry = self.steam._steamplay_app_mappings.get(appid)
+        if entry is not None:
+            tool = dict(entry)
             tool["name"] = tool["tool"]
             tool["source"] = "valve"
             return tool
         # User default
-        tool = dict(mapping["0"])
-        tool["source"] = "default"
-        return tool
+        return self.steam._default_compat_tool
 
 
 class App(AppInfo):
+    __slots__ = "library_folder", "steamapps_path", "_manifest_file"
+
     steam: 'Steam'
     library_folder: 'LibraryFolder'
     steamapps_path: Path
-    manifest_path: Path
-    manifest: DeepDict
 
-    def __init__(self, libfolder, manifest_path: Path, *, manifest_data=None):
+    def __init__(self, libfolder, manifest_path: Union[str, os.PathLike], *, manifest_data=None, appid: Optional[int]=None):
         self.library_folder = libfolder
         self.steamapps_path = libfolder.steamapps_path
 
-        self.manifest_path = manifest_path
-        if manifest_data is None:
-            with open(manifest_path, encoding="utf-8") as f:
-                self.manifest = _vdf.parse(f)
-        else:
-            self.manifest = manifest_data
+        self._manifest_file = manifest_path
+        if manifest_data is not None:
+            self.__dict__["manifest"] = self._check_manifest(manifest_data)
+
+        # When the appid is known up front, the manifest is only loaded on first use
+        if appid is None:
+            appid = int(dd_getpath(self.manifest, ("AppState", "appid"), t=str))
 
-        if "AppState" not in self.manifest:
+        super().__init__(libfolder.steam, appid)
+
+    def _check_manifest(self, manifest: DeepDict) -> DeepDict:
+        if "AppState" not in manifest:
             raise MalformedManifestError("App manifest doesn't have AppState key", self.manifest_path)
+        return manifest
 
-        super().__init__(libfolder.steam, int(dd_getpath(self.manifest, ("AppState", "appid"), t=str)))
+    @cached_property
+    def manifest_path(self) -> Path:
+        return Path(self._manifest_file)
+
+    @cached_property
+    def manifest(self) -> DeepDict:
+        return self._check_manifest(_load_vdf(self._manifest_file))
 
     installed = True
 
@@ -124,13 +271,13 @@ class App(AppInfo):
 
     @cached_property
     def install_path(self) -> Path:
-        return self.steamapps_path / "common" / self.install_dir
+        return self.steamapps_path.joinpath("common", self.install_dir)
 
     # Workshop
     # TODO
     @cached_property
     def workshop_path(self) -> Path:
-        return self.steamapps_path / "workshop" / "content" / str(self.appid)
+        return self.steamapps_path.joinpath("workshop", "content", str(self.appid))
 
     # Steam Play info
     @property
@@ -155,7 +302,7 @@ class App(AppInfo):
 
     @cached_property
     def compat_path(self) -> Path:
-        return self.steamapps_path / "compatdata" / str(self.appid)
+        return self.steamapps_path.joinpath("compatdata", str(self.appid))
 
     @cached_property
     def compat_prefix(self) -> Path:
@@ -169,18 +316,28 @@ class App(AppInfo):
     declared_install_size = DictPathRoProperty[int]("manifest", ("AppState", "SizeOnDisk"), 0, type=int)
 
     def compute_install_size(self) -> int:
-        def sum_size(p: Path):
-            acc = 0
-            for x in p.iterdir():
-                if x.is_dir():
-                    acc += sum_size(x)
+        total = 0
+        subdirs = []
+        with os.scandir(self.install_path) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.path)
                 else:
-                    acc += x.stat().st_size
-            return acc
-        return sum_size(self.install_path)
+                    total += e.stat(follow_symlinks=False).st_size
+        if subdirs:
+            # Walking is bound by syscall latency, so overlap the top-level subtrees
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4, len(subdirs))) as pool:
+                total += sum(pool.map(_tree_size, subdirs))
+        return total
 
 
 class LibraryFolder:
+    __slots__ = "steam", "path", "__dict__"
+
+    # Threads reading app manifests, and how many reads may be queued ahead of the consumer
+    LOAD_WORKERS = 8
+    LOAD_WINDOW = 16
+
     steam: 'Steam'
     path: Path
 
@@ -194,57 +351,116 @@ class LibraryFolder:
     # Paths
     @cached_property
     def steamapps_path(self) -> Path:
-        steamapps = self.path / "steamapps"
-        if not steamapps.exists():
-            # Emulate case-insensitivity
-            cased = self.path / "SteamApps"
-            if cased.exists():
-                steamapps = cased
-            else:
-                # try to find other variation
-                found = [d for d in self.path.iterdir() if d.is_dir() and d.name.lower() == "steamapps"]
-                if len(found) > 1:
-                    raise Exception("More than one steamapps folder in library folder", self.path)
-                elif found:
-                    return found[0]
-            # if none exists, return non-existant default name
-        return steamapps
+        # Emulate case-insensitivity from a single directory listing
+        try:
+            with os.scandir(self.path) as it:
+                found = [e.name for e in it if e.name.lower() == "steamapps" and e.is_dir()]
+        except FileNotFoundError:
+            found = []
+        for name in "steamapps", "SteamApps":
+            if name in found:
+                return self.path / name
+        # try to find other variation
+        if len(found) > 1:
+            raise Exception("More than one steamapps folder in library folder", self.path)
+        elif found:
+            return self.path / found[0]
+        # if none exists, return non-existant default name
+        return self.path / "steamapps"
 
     @property
     def common_path(self) -> Path:
         return self.steamapps_path / "common"
 
+    @property
+    def _manifest_files(self) -> Iterable[str]:
+        # Plain prefix/suffix check, Path.glob() would go through fnmatch and extra stat()s
+        try:
+            with os.scandir(self.steamapps_path) as it:
+                for e in it:
+                    if e.name.startswith("appmanifest_") and e.name.endswith(".acf"):
+                        yield e.path
+        except FileNotFoundError:
+            pass
+
     @property
     def appmanifests(self) -> Iterable[Path]:
-        return self.steamapps_path.glob("appmanifest_*.acf") # pylint:disable=no-member
+        return map(Path, self._manifest_files)
+
+    def _make_app(self, manifest: str, data: DeepDict) -> Optional[App]:
+        try:
+            return App(self, manifest, manifest_data=data)
+        except MalformedManifestError as e:
+            print("Warning: Malformed app manifest:", e.filename)
+            return None
 
     @property
     def apps(self) -> Iterable[App]:
-        for mf in self.appmanifests:
+        # Overlap reading the manifests, results still come back in order.
+        # Only a bounded window is submitted ahead, so a consumer that stops early
+        # doesn't wait for the rest of the library to be read.
+        with ThreadPoolExecutor(max_workers=self.LOAD_WORKERS) as pool:
+            pending: Deque[Tuple[str, Future]] = deque()
             try:
-                yield App(self, mf)
-            except MalformedManifestError as e:
-                print("Warning: Malformed app manifest:", e.filename)
+                for mf in self._manifest_files:
+                    pending.append((mf, pool.submit(_load_vdf, mf)))
+                    if len(pending) >= self.LOAD_WINDOW:
+                        mf, f = pending.popleft()
+                        app = self._make_app(mf, f.result())
+                        if app is not None:
+                            yield app
+                while pending:
+                    mf, f = pending.popleft()
+                    app = self._make_app(mf, f.result())
+                    if app is not None:
+                        yield app
+            finally:
+                for _, f in pending:
+                    f.cancel()
+
+    def _load_apps(self) -> List[App]:
+        """ Read all apps without a thread pool of its own, for callers that already run folders in parallel """
+        apps = (self._make_app(mf, _load_vdf(mf)) for mf in self._manifest_files)
+        return [app for app in apps if app is not None]
+
+    @cached_property
+    def _manifest_ids(self) -> FrozenSet[int]:
+        """ Appids with a manifest in this library, from a single directory listing """
+        try:
+            names = os.listdir(self.steamapps_path)
+        except FileNotFoundError:
+            return frozenset()
+        return frozenset(int(name[12:-4]) for name in names
+                         if name.startswith("appmanifest_") and name.endswith(".acf") and name[12:-4].isdigit())
+
+    def invalidate(self):
+        """ Forget the cached manifest listing, e.g. after apps were installed or removed """
+        self.__dict__.pop("_manifest_ids", None)
+
+    def _manifest_path(self, appid: int) -> Path:
+        return self.steamapps_path / ("appmanifest_%d.acf" % appid)
 
     def get_app(self, appid: int) -> Optional[App]:
-        manifest = self.steamapps_path / ("appmanifest_%d.acf" % appid)
-        if manifest.exists():
-            return App(self, manifest)
+        if appid in self._manifest_ids:
+            return App(self, self._manifest_path(appid))
         return None
 
-    def find_apps_re(self, regexp: str) -> Iterable[App]:
-        reg = re.compile(r'"name"\s+".*%s.*"' % regexp, re.IGNORECASE)
-        for manifest in self.appmanifests:
-            with open(manifest, encoding="utf-8") as f:
-                content = f.read()
-            if reg.search(content):
+    def _find_apps_matching(self, match: ManifestMatcher) -> Iterable[App]:
+        for manifest in self._manifest_files:
+            content = _scan_manifest(manifest, match)
+            if content is not None:
                 yield App(self, manifest, manifest_data=_vdf.parse_string(content))
 
+    def find_apps_re(self, regexp: str) -> Iterable[App]:
+        return self._find_apps_matching(_manifest_name_matcher(_regex_name_matcher(regexp)))
+
     def find_apps(self, pattern: str) -> Iterable[App]:
-        return self.find_apps_re(fnmatch.translate(pattern).rstrip("\\Z"))
+        return self._find_apps_matching(_manifest_name_matcher(_glob_name_matcher(pattern)))
 
 
 class UserAppConfig:
+    __slots__ = "user", "appid"
+
     user: 'LoginUser'
     appid: int
 
@@ -275,6 +491,8 @@ class UserAppConfig:
 
 
 class LoginUser:
+    __slots__ = "steam", "id", "info", "__dict__"
+
     steam: 'Steam'
     id: int
     info: Dict[str, str]
@@ -301,12 +519,11 @@ class LoginUser:
 
     @property
     def localconfig_vdf(self) -> Path:
-        return self.userdata_path / "config" / "localconfig.vdf"
+        return self.userdata_path.joinpath("config", "localconfig.vdf")
 
     @cached_property
     def localconfig(self) -> DeepDict:
-        with open(self.localconfig_vdf, encoding="utf-8") as f:
-            return _vdf.parse(f)
+        return self.steam._read_vdf(self.localconfig_vdf)
 
     # Game config
     def get_app_config(self, app: Union[int, App]) -> Optional[UserAppConfig]:
@@ -316,6 +533,8 @@ class LoginUser:
 
 
 class Steam:
+    __slots__ = "root", "__dict__"
+
     root: Path
 
     def __init__(self, install_path=None):
@@ -328,14 +547,21 @@ class Steam:
 
     @staticmethod
     def find_install_path() -> Optional[Path]:
+        # Explicit override
+        if (root := os.environ.get("STEAMUTIL_ROOT")) and os.path.isdir(root):
+            return Path(root)
+        return Steam._discover_install_path()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _discover_install_path() -> Optional[Path]:
         # Linux
         if sys.platform.startswith("linux"):
             # Try ~/.steam first
-            dotsteam = Path("~/.steam").expanduser()
-            if dotsteam.exists():
-                steamroot = (dotsteam / "root").resolve()
-                if steamroot.exists():
-                    return steamroot
+            try:
+                return Path("~/.steam/root").expanduser().resolve(strict=True)
+            except (OSError, RuntimeError):
+                pass
             # Try ~/.local/share/Steam, classic ~/Steam
             data_dir = Path(os.environ.get("XDG_DATA_HOME", "~/.local/share")).expanduser()
             for path in data_dir, Path("~").expanduser():
@@ -359,11 +585,10 @@ class Steam:
             # try PROGRAMFILES
             pfiles = (os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"),
                       os.environ.get("ProgramFiles", "C:\\Program Files"))
-            for path in pfiles:
-                if path.exists():
-                    path /= "Steam"
-                    if path.exists():
-                        return path
+            for pfiles_dir in pfiles:
+                path = Path(pfiles_dir, "Steam")
+                if os.path.isdir(path):
+                    return path
         return None
 
     @property
@@ -374,23 +599,35 @@ class Steam:
     @property
     def libraryfolders_vdf(self) -> Path:
         """ The libraryfolders.vdf file listing all configured library locations """
-        return self.root / "steamapps" / "libraryfolders.vdf"
+        return self.root.joinpath("steamapps", "libraryfolders.vdf")
 
     @property
     def config_vdf(self) -> Path:
-        return self.root / "config" / "config.vdf"
+        return self.root.joinpath("config", "config.vdf")
 
     @property
     def loginusers_vdf(self) -> Path:
-        return self.root / "config" / "loginusers.vdf"
+        return self.root.joinpath("config", "loginusers.vdf")
+
+    # VDF files
+    @cached_property
+    def _vdf_cache(self) -> Dict[Tuple[Path, int, int], DeepDict]:
+        return {}
+
+    def _read_vdf(self, path: Path, parser: VdfParser=_vdf) -> DeepDict:
+        """ Parse a VDF file, reusing the result while the file is unchanged """
+        key = (path, id(parser), os.stat(path).st_mtime_ns)
+        data = self._vdf_cache.get(key)
+        if data is None:
+            data = self._vdf_cache[key] = _load_vdf(path, parser)
+        return data
 
     # Users
     @cached_property
     def most_recent_user(self) -> Optional[LoginUser]:
         try:
             # Apparently, Steam doesn't care about case in the config/*.vdf keys
-            with open(self.loginusers_vdf, encoding="utf-8") as f:
-                data = _vdf_ci.parse(f)
+            data = self._read_vdf(self.loginusers_vdf, _vdf_ci)
             for id, info in cast(Mapping[str, Dict], data["users"]).items():
                 if info["mostrecent"] == "1":
                     return LoginUser(self, int(id), info)
@@ -401,13 +638,12 @@ class Steam:
     def get_userdata_path(self, user_id: Union[int, LoginUser]) -> Path:
         if isinstance(user_id, LoginUser):
             user_id = user_id.account_id
-        return self.root / "userdata" / str(user_id)
+        return self.root.joinpath("userdata", str(user_id))
 
     # Config
     @cached_property
     def config(self) -> DeepDict:
-        with open(self.config_vdf, encoding="utf-8") as f:
-            return _vdf.parse(f)
+        return self._read_vdf(self.config_vdf)
 
     config_install_store = DictPathProperty[Dict]("config", ("InstallConfigStore",))
     config_software_steam = DictPathProperty[Dict]("config", ("InstallConfigStore", "Software", "Valve", "Steam"))
@@ -416,16 +652,37 @@ class Steam:
     # AppInfo cache
     @cached_property
     def appinfo_vdf(self):
-        return self.root / "appcache" / "appinfo.vdf"
+        return self.root.joinpath("appcache", "appinfo.vdf")
 
     @cached_property
     def appinfo(self) -> AppInfoFile:
         return AppInfoFile.open(self.appinfo_vdf)
 
-    @SettableCachedProperty
+    def close(self):
+        """ Release the appinfo cache mapping, if it was opened """
+        appinfo = self.__dict__.pop("appinfo", None)
+        if appinfo is not None:
+            appinfo.close()
+
+    @cached_property
     def steamplay_manifest(self) -> DeepDict:
-        with self.appinfo as info:
-            return info[891390]["appinfo"]
+        # Don't close the shared appinfo handle
+        return self.appinfo[891390]["appinfo"]
+
+    # Resolved once for bulk compat_tool lookups. Delete these after replacing config or steamplay_manifest
+    @cached_property
+    def _compat_tool_mapping(self) -> Dict:
+        return self.compat_tool_mapping
+
+    @cached_property
+    def _steamplay_app_mappings(self) -> Dict:
+        return self.steamplay_manifest["extended"]["app_mappings"]
+
+    @cached_property
+    def _default_compat_tool(self) -> Dict:
+        tool = dict(self._compat_tool_mapping["0"])
+        tool["source"] = "default"
+        return tool
 
     @cached_property
     def compat_tools(self) -> Dict[str, Dict]:
@@ -439,49 +696,70 @@ class Steam:
                 tool["install_path"] = app.install_path
                 tools[name] = tool
         # Find custom compat tools
-        compattools_d = self.root / "compatibilitytools.d"
-        if compattools_d.exists():
-            manifests = []
-            for p in compattools_d.iterdir():
-                if p.suffix == ".vdf":
-                    manifests.append(p)
-                elif p.is_dir():
-                    c = p / "compatibilitytool.vdf"
-                    if c.exists():
-                        manifests.append(c)
-            for mfst_path in manifests:
-                with open(mfst_path, encoding="utf-8") as f:
-                    mfst = _vdf.parse(f)
-                for name, t in dd_getpath(mfst, ("compatibilitytools", "compat_tools"), t=dict).items():
-                    # TODO warn duplicate name
-                    t["install_path"] = mfst_path.parent / t["install_path"]
-                    tools[name] = t
+        manifests = []
+        try:
+            with os.scandir(self.root / "compatibilitytools.d") as it:
+                for e in it:
+                    if e.name.startswith("."):
+                        continue
+                    # Follow symlinks, tools are often linked in from elsewhere
+                    if e.name.endswith(".vdf") and e.is_file():
+                        manifests.append(Path(e.path))
+                    elif e.is_dir():
+                        c = Path(e.path, "compatibilitytool.vdf")
+                        if c.is_file():
+                            manifests.append(c)
+        except FileNotFoundError:
+            pass
+        for mfst_path in manifests:
+            mfst = _load_vdf(mfst_path)
+            for name, t in dd_getpath(mfst, ("compatibilitytools", "compat_tools"), t=dict).items():
+                # TODO warn duplicate name
+                t["install_path"] = mfst_path.parent / t["install_path"]
+                tools[name] = t
         return tools
 
     # Game/App Library
     @cached_property
     def library_folder_paths(self) -> List[Path]:
-        with open(self.libraryfolders_vdf, encoding="utf-8") as f:
-            data = _vdf_ci.parse(f)
-        def gen():
-            for k, v in dd_getpath(data, ("LibraryFolders",), t=dict).items():
+        def parse():
+            folders = dd_getpath(self._read_vdf(self.libraryfolders_vdf, _vdf_ci), ("LibraryFolders",), t=dict)
+            paths = []
+            # Numbering may have gaps after a library was removed, so take every numeric key
+            for k, v in folders.items():
                 if k.isdigit():
                     if isinstance(v, str):
-                        yield Path(v)
+                        paths.append(Path(v))
                     elif 'path' in v:
-                        yield Path(v['path'])
+                        paths.append(Path(v['path']))
                     else:
                         raise ValueError("Unknown format of libraryfolders.vdf")
-        return list(gen())
+            return paths
+        return _cached_by_mtime("libraryfolders", self.libraryfolders_vdf, parse)
 
     @cached_property
     def library_folders(self) -> List[LibraryFolder]:
         return [LibraryFolder(self, self.root)] + [LibraryFolder(self, p) for p in self.library_folder_paths]
 
+    def _map_library_folders(self, func: Callable[[LibraryFolder], List[T]]) -> Iterable[T]:
+        """
+        Run func on all library folders in parallel, yielding the results in folder order.
+        Every folder is processed completely, so only use this for full listings
+        """
+        folders = self.library_folders
+        if len(folders) < 2:
+            for lf in folders:
+                yield from func(lf)
+            return
+        # Libraries are often on different disks, overlap their I/O
+        with ThreadPoolExecutor(max_workers=min(8, len(folders))) as pool:
+            for result in pool.map(func, folders):
+                yield from result
+
     @property
     def apps(self) -> Iterable[App]:
-        for lf in self.library_folders:
-            yield from lf.apps
+        # The folders are already read in parallel, don't nest another pool per folder
+        return self._map_library_folders(LibraryFolder._load_apps)
 
     @overload
     def get_app(self, id: int, installed: Literal[True]=True) -> Optional[App]: ...
@@ -494,60 +772,67 @@ class Steam:
             if app is not None:
                 return app
         if not installed:
-            for appinfo in self.appinfo:
-                if appinfo.id == id:
-                    return AppInfo(self, id, appinfo_data=appinfo)
+            appinfo = self.appinfo.apps.get(id)
+            if appinfo is not None:
+                return AppInfo(self, id, appinfo_data=appinfo)
         return None
 
-    @overload
-    def find_apps_re(self, regexp: str, installed: Literal[True]) -> Iterable[App]: ...
-    @overload
-    def find_apps_re(self, regexp: str, installed: Literal[False]) -> Iterable[AppInfo]: ...
-
-    def find_apps_re(self, regexp: str, installed=True) -> Iterable[AppInfo]:
-        """ Find all apps by regular expression """
+    @cached_property
+    def _appinfo_name_index(self) -> Dict[str, List[int]]:
+        """ Lower-cased app names in the appinfo cache, mapped to their appids """
+        index: Dict[str, List[int]] = {}
+        broken_ids = []
+        for appinfo in self.appinfo:
+            # Skip broken entries
+            try:
+                name = appinfo["appinfo"]["common"]["name"]
+            except KeyError:
+                broken_ids.append(appinfo.id)
+                continue
+            index.setdefault(name.lower(), []).append(appinfo.id)
+        if broken_ids:
+            print("[SteamUtil] Warning: found broken entries in appinfo cache:", ",".join(map(str, broken_ids)))
+        return index
+
+    def _find_apps_matching(self, match: Callable[[str], Any], match_manifest: ManifestMatcher, installed: bool) -> Iterable[AppInfo]:
         if not installed:
             # Search whole appinfo cache
-            reg = re.compile(regexp, re.IGNORECASE)
-            broken_ids = set()
             try:
-                for appinfo in self.appinfo:
-                    # Skip broken entries
-                    try:
-                        name = appinfo["appinfo"]["common"]["name"]
-                    except KeyError:
-                        broken_ids.add(appinfo.id)
+                # The first library folder with a manifest wins
+                installed_in = {appid: lf for lf in reversed(self.library_folders) for appid in lf._manifest_ids}
+                for name, appids in self._appinfo_name_index.items():
+                    if not match(name):
                         continue
-                    if reg.search(name):
-                        for lf in self.library_folders:
-                            app = lf.get_app(appinfo.id)
-                            if app:
-                                yield app
-                                break
+                    for appid in appids:
+                        lf = installed_in.get(appid)
+                        if lf is not None:
+                            # Don't parse the manifest until something needs it
+                            yield App(lf, lf._manifest_path(appid), appid=appid)
                         else:
-                            yield AppInfo(self, appinfo.id, appinfo_data=appinfo)
+                            yield AppInfo(self, appid, appinfo_data=self.appinfo[appid])
             except Exception:
                 import traceback
                 traceback.print_exc()
                 print("[SteamUtil] Warning: could not read non-installed apps from Steam appinfo cache. Searching locally")
             else:
                 return
-            finally:
-                if broken_ids:
-                    print("[SteamUtil] Warning: found broken entries in appinfo cache:", ",".join(map(str, broken_ids)))
-        # Search local manifests directly
-        reg = re.compile(r'"name"\s+".*%s.*"' % regexp, re.IGNORECASE)
+        # Search local manifests directly, lazily so find_app() can stop at the first match
         for lf in self.library_folders:
-            for manifest in lf.appmanifests:
-                with open(manifest, encoding="utf-8") as f:
-                    content = f.read()
-                if reg.search(content):
-                    yield App(lf, manifest, manifest_data=_vdf.parse_string(content))
+            yield from lf._find_apps_matching(match_manifest)
+
+    @overload
+    def find_apps_re(self, regexp: str, installed: Literal[True]) -> Iterable[App]: ...
+    @overload
+    def find_apps_re(self, regexp: str, installed: Literal[False]) -> Iterable[AppInfo]: ...
+
+    def find_apps_re(self, regexp: str, installed=True) -> Iterable[AppInfo]:
+        """ Find all apps by regular expression """
+        match = _regex_name_matcher(regexp)
+        return self._find_apps_matching(match, _manifest_name_matcher(match), installed)
 
     def find_apps(self, pattern: str, installed=True) -> Iterable[App]:
-        return self.find_apps_re(fnmatch.translate(pattern).rstrip("\\Z"), installed=installed)
+        match = _glob_name_matcher(pattern)
+        return self._find_apps_matching(match, _manifest_name_matcher(match), installed)
 
     def find_app(self, pattern: str, installed=True) -> Optional[App]:
-        for app in self.find_apps(pattern, installed=installed):
-            return app
-        return None
+        return next(iter(self.find_apps(pattern, installed=installed)), None)
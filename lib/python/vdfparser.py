@@ -7,8 +7,10 @@ from __future__ import unicode_literals
 
 import datetime
 import io
+import mmap
+import re
 import struct
-from typing import (Any, BinaryIO, Dict, Iterator, List, Mapping, NewType, Optional, Sequence,
+from typing import (Any, BinaryIO, Callable, Dict, Iterator, List, Mapping, NewType, Optional, Sequence,
                     Tuple, Type, TypeVar, Union, overload)
 
 try:
@@ -48,7 +50,7 @@ def dd_getpath(dct: DeepDict, path: DeepDictPath, default: Union[_DefaultT, _NoD
     @param dct The nested mapping
     @param path The path to retrieve. Represented by a tuple of strings.
     @param default A default value. Raises KeyError if omitted.
-    @param t Result type for built-in typing.cast(), specify 'str' or 'dict'
+    @param t Result type for built-in typing.cast(), specify 'str' or 'dict' (accepts any mapping, e.g. FrozenVdfMap)
     """
     d: Any = dct
     try:
@@ -66,7 +68,7 @@ def dd_getpath(dct: DeepDict, path: DeepDictPath, default: Union[_DefaultT, _NoD
                 else:
                     raise KeyError("Dictionary has none of key candidates %s" % pc)
         # XXX: runtime type check
-        assert (t is None or isinstance(d, t)), f"Expected value at path {path} to be {t}, not {type(d)}"
+        assert (t is None or isinstance(d, Mapping if t is dict else t)), f"Expected value at path {path} to be {t}, not {type(d)}"
         return d
     except KeyError:
         if default is not _nodefault:
@@ -79,12 +81,13 @@ def dd_getpath(dct: DeepDict, path: DeepDictPath, default: Union[_DefaultT, _NoD
 class LowerCaseNormalizingDict(dict):
     def __init__(self, *args, **kwds):
         super().__init__()
-        # XXX: is there a better way to do this?
+        # Keys are folded once here, so lookups only need to fold the requested key
+        setitem = super().__setitem__
         for k,v in dict(*args,**kwds).items():
             k_ = k.lower()
             if k_ in self:
                 raise KeyError("Duplicate key in LowerCaseNormalizingDict arguments: %s" % k_)
-            self[k_] = v
+            setitem(k_, v)
 
     def __setitem__(self, key, value):
         return super().__setitem__(key.lower(), value)
@@ -93,7 +96,45 @@ class LowerCaseNormalizingDict(dict):
         return super().__getitem__(key.lower())
 
     def get(self, key, default=None):
-        return super().get(key.lower(), default=default)
+        return super().get(key.lower(), default)
+
+    def setdefault(self, key, default=None):
+        return super().setdefault(key.lower(), default)
+
+
+#### Compact read-only mapping.
+# appinfo.vdf holds tens of thousands of mostly tiny maps, where dict overhead dominates
+class FrozenVdfMap(Mapping[str, Any]):
+    """
+    Immutable mapping backed by a tuple of keys and a tuple of values.
+    Uses a fraction of the memory of a dict, at the cost of linear lookups.
+    Can be passed as factory to both VdfParser and BinaryVdfParser.
+    """
+    __slots__ = "_keys", "_values"
+
+    def __init__(self, pairs=()):
+        # Later duplicates win, like with dict
+        d = dict(pairs)
+        self._keys = tuple(d)
+        self._values = tuple(d.values())
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, dict(zip(self._keys, self._values)))
 
 
 #### Text VDF parser.
@@ -102,6 +143,7 @@ class VdfParser:
     Simple Steam/Source VDF parser
     """
     # Special Characters
+    empty_string = ""
     quote_char = "\""
     escape_char = "\\"
     begin_char = "{"
@@ -117,6 +159,23 @@ class VdfParser:
         @param factory A factory function creating a mapping type from an iterable of key/value tuples.
         """
         self.encoding = encoding
+        # Characters that need attention; everything else is part of an unquoted token
+        whitespace = "[%s]" % re.escape(self.whitespace_chars)
+        in_quotes = "[%s]" % re.escape(self.quote_char + self.escape_char)
+        special = "%s*[%s]|%s+" % (whitespace, re.escape(self.quote_char + self.escape_char +
+                                                         self.begin_char + self.end_char + self.comment_char), whitespace)
+        # Common case: one or two quoted strings without escapes, like a key/value line
+        quoted = "%s([^%s]*)%s" % (re.escape(self.quote_char), in_quotes[1:-1], re.escape(self.quote_char))
+        simple = "%s*%s(?:%s*%s)?" % (whitespace, quoted, whitespace, quoted)
+        if encoding:
+            self._re_special = re.compile(special.encode(encoding))
+            self._re_in_quotes = re.compile(in_quotes.encode(encoding))
+            self._re_simple = re.compile(simple.encode(encoding))
+        else:
+            self._re_special = re.compile(special)
+            self._re_in_quotes = re.compile(in_quotes)
+            self._re_simple = re.compile(simple)
+
         if encoding:
             self.empty_string   = self.empty_string.encode(encoding)
             self.quote_char     = self.quote_char.encode(encoding)
@@ -130,129 +189,187 @@ class VdfParser:
         self.strict = strict
 
     def _make_map(self, tokens):
-        return self.factory(zip(tokens[::2], tokens[1::2]))
+        # Pair up keys and values without slicing the token list twice
+        it = iter(tokens)
+        return self.factory(zip(it, it))
 
-    def _parse_map(self, fd, inner=False):
+    def _parse_map(self, buf, pos=0):
+        """ Parse a mapping from buf starting at pos, returning it and the position after it """
         tokens = []
-        current = []
+        # Token lists of the enclosing maps while inside a nested one
+        stack = []
+        current = [] # Pieces of the current unquoted token
         escape = False
         quoted = False
-        comment = False
-
-        if self.encoding:
-            make_string = b"".join
-        else:
-            make_string = "".join
-
-        def finish(override=False):
-            if current or override:
-                tokens.append(make_string(current))
-                current.clear()
+        end = len(buf)
+        make_string = self.empty_string.join
+        match_simple = self._re_simple.match
+        search_special = self._re_special.search
+        search_quoted = self._re_in_quotes.search
+        whitespace_chars = self.whitespace_chars
+        quote_char = self.quote_char
+        escape_char = self.escape_char
+        begin_char = self.begin_char
+        end_char = self.end_char
+        newline_char = self.newline_char
+        add_token = tokens.append
+        add_piece = current.append
+
+        def flush():
+            token = make_string(current)
+            current.clear()
+            return token
 
         while True:
-            c = fd.read(1)
-
-            if not c:
-                finish()
-                if len(tokens) / 2 != len(tokens) // 2:
-                    raise ValueError("Unexpected EOF: Last pair incomplete")
-                elif self.strict and (escape or quoted or inner):
-                    raise ValueError("Unexpected EOF: EOF encountered while not processing outermost mapping")
-                return self._make_map(tokens)
-
-            if escape:
-                current.append(c)
-                escape = False
-
-            elif quoted:
-                if c == self.escape_char:
+            m = match_simple(buf, pos)
+            if m is not None:
+                if current:
+                    add_token(flush())
+                key, value = m.groups()
+                add_token(key)
+                if value is not None:
+                    add_token(value)
+                pos = m.end()
+                continue
+
+            m = search_special(buf, pos)
+            if m is None:
+                if pos < end:
+                    add_piece(buf[pos:])
+                break
+            start = m.start()
+            if start > pos:
+                add_piece(buf[pos:start])
+            c = m.group()
+            pos = m.end()
+
+            # Whitespace ends the current token
+            if len(c) > 1 or c in whitespace_chars:
+                if current:
+                    add_token(flush())
+                c = c[-1:]
+
+            if c in whitespace_chars:
+                pass
+
+            elif c == quote_char:
+                if current:
+                    add_token(flush())
+                quoted = True
+                while True:
+                    q = search_quoted(buf, pos)
+                    if q is None:
+                        if pos < end:
+                            add_piece(buf[pos:])
+                        pos = end
+                        break
+                    if q.start() > pos:
+                        add_piece(buf[pos:q.start()])
+                    pos = q.end()
+                    if q.group() == quote_char:
+                        quoted = False
+                        break
+                    # Escaped character
+                    if pos >= end:
+                        escape = True
+                        break
+                    add_piece(buf[pos:pos+1])
+                    pos += 1
+                if quoted:
+                    break
+                # Quoted strings are tokens even when empty
+                add_token(flush())
+
+            elif c == begin_char:
+                if current:
+                    add_token(flush())
+                if not len(tokens) & 1 and (self.strict or self.factory is dict):
+                    raise ValueError("Sub-dictionary cannot be a key")
+                stack.append(tokens)
+                tokens = []
+                add_token = tokens.append
+
+            elif c == end_char:
+                if current:
+                    add_token(flush())
+                if len(tokens) & 1:
+                    raise ValueError("Unexpected close: Missing last value (Unbalanced tokens)")
+                if not stack:
+                    return self._make_map(tokens), pos
+                value = self._make_map(tokens)
+                tokens = stack.pop()
+                add_token = tokens.append
+                add_token(value)
+
+            elif c == escape_char:
+                if pos >= end:
                     escape = True
-                elif c == self.quote_char:
-                    quoted = False
-                    finish(override=True)
-                else:
-                    current.append(c)
-
-            elif comment:
-                if c == self.newline_char:
-                    comment = False
+                    break
+                add_piece(buf[pos:pos+1])
+                pos += 1
+
+            # Comments start with two comment chars
+            elif current and current[-1][-1:] == c:
+                current[-1] = current[-1][:-1]
+                if not current[-1]:
+                    current.pop()
+                if current:
+                    add_token(flush())
+                nl = buf.find(newline_char, pos)
+                pos = end if nl < 0 else nl + 1
 
             else:
-                if c == self.escape_char:
-                    escape = True
-                elif c == self.begin_char:
-                    finish()
-                    if len(tokens) / 2 == len(tokens) // 2 and (self.strict or self.factory is dict):
-                        raise ValueError("Sub-dictionary cannot be a key")
-                    tokens.append(self._parse_map(fd, True))
-                elif c == self.end_char:
-                    finish()
-                    if len(tokens) / 2 != len(tokens) // 2:
-                        raise ValueError("Unexpected close: Missing last value (Unbalanced tokens)")
-                    return self._make_map(tokens)
-                elif c in self.whitespace_chars:
-                    finish()
-                elif c == self.quote_char:
-                    finish()
-                    quoted = True
-                elif c == self.comment_char and current and current[-1] == self.comment_char:
-                    del current[-1]
-                    finish()
-                    comment = True
-                else:
-                    current.append(c)
+                add_piece(c)
+
+        # EOF, close any maps still open
+        if current:
+            add_token(flush())
+        while True:
+            if len(tokens) & 1:
+                raise ValueError("Unexpected EOF: Last pair incomplete")
+            elif self.strict and (escape or quoted or stack):
+                raise ValueError("Unexpected EOF: EOF encountered while not processing outermost mapping")
+            if not stack:
+                return self._make_map(tokens), end
+            value = self._make_map(tokens)
+            tokens = stack.pop()
+            tokens.append(value)
 
     def parse(self, fd) -> DeepDict:
         """
         Parse a VDF file into a python dictionary
         """
-        return self._parse_map(fd)
+        return self._parse_map(fd.read())[0]
 
     def parse_string(self, content) -> DeepDict:
         """
         Parse the content of a VDF file
         """
-        if self.encoding:
-            return self.parse(io.BytesIO(content))
-        else:
-            return self.parse(io.StringIO(content))
+        return self._parse_map(content)[0]
 
     def _make_literal(self, lit):
         # TODO
         return "\"%s\"" % (str(lit).replace("\\", "\\\\").replace("\"", "\\\""))
 
-    def _write_map(self, fd, dictionary, indent):
-        if indent is None:
-            def write(str=None, i=False, d=False, nl=False):
-                if str:
-                    fd.write(str)
-                if d:
-                    fd.write(" ")
-
-        else:
-            def write(str=None, i=False, d=False, nl=False):
-                if not str and nl:
-                    fd.write("\n")
-                else:
-                    if i:
-                        fd.write("\t" * indent)
-                    if str:
-                        fd.write(str)
-                    if nl:
-                        fd.write("\n")
-                    elif d:
-                        fd.write("\t\t")
+    def _write_map_pretty(self, emit, dictionary, indent):
+        tabs = "\t" * indent
+        for k, v in dictionary.items():
+            # Most values are strings, spare them the slower Mapping ABC check
+            if not isinstance(v, str) and isinstance(v, Mapping):
+                emit("%s%s\n%s{\n" % (tabs, self._make_literal(k), tabs))
+                self._write_map_pretty(emit, v, indent + 1)
+                emit(tabs + "}\n")
+            else:
+                emit("%s%s\t\t%s\n" % (tabs, self._make_literal(k), self._make_literal(v)))
 
+    def _write_map_compact(self, emit, dictionary):
         for k, v in dictionary.items():
-            if isinstance(v, dict):
-                write(self._make_literal(k), i=1, d=1, nl=1)
-                write("{", i=1, nl=1)
-                self._write_map(fd, v, indent + 1 if indent is not None else None)
-                write("}", i=1)
+            if not isinstance(v, str) and isinstance(v, Mapping):
+                emit(self._make_literal(k) + " {")
+                self._write_map_compact(emit, v)
+                emit("} ")
             else:
-                write(self._make_literal(k), i=1, d=1)
-                write(self._make_literal(v))
-            write(d=1, nl=1)
+                emit("%s %s " % (self._make_literal(k), self._make_literal(v)))
 
     def write(self, fd, dictionary: DeepDict, *, pretty=True):
         """
@@ -260,142 +377,207 @@ class VdfParser:
         """
         if self.encoding:
             raise NotImplementedError("Writing in binary mode is not implemented yet.") # TODO (maybe)
-        self._write_map(fd, dictionary, 0 if pretty else None)
+        # Collect the pieces and hand them to the file in one go
+        out: List[str] = []
+        if pretty:
+            self._write_map_pretty(out.append, dictionary, 0)
+        else:
+            self._write_map_compact(out.append, dictionary)
+        fd.write("".join(out))
 
 
 #### Binary parsing utils
-def _read_exactly(fd: BinaryIO, s: int) -> bytes:
-    cs = fd.read(s)
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+def _buf_exactly(buf: Buffer, pos: int, s: int) -> Tuple[bytes, int]:
+    cs = buf[pos:pos+s]
     if len(cs) < s:
         raise EOFError()
-    return cs
-
-def _read_int(fd: BinaryIO, size: int=4, signed=False) -> int:
-    return int.from_bytes(_read_exactly(fd, size), 'little', signed=signed)
-
-def _read_struct(fd: BinaryIO, s: struct.Struct):
-    return s.unpack(fd.read(s.size))
-
-def _read_until(fd: BinaryIO, delim: bytes, bufsize: int=64) -> bytes:
-    pieces = []
-    piece: bytes
-    end = -1
-
-    while end == -1:
-        piece = fd.read(bufsize)
-        if not piece:
-            raise EOFError()
-
-        end = piece.find(delim)
-        pieces.append(piece[:end])
-
-    fd.seek(end - len(piece) + len(delim), io.SEEK_CUR)
-
-    return b"".join(pieces)
+    return cs, pos + s
+
+def _buf_unpacker(s: struct.Struct) -> Callable[[Buffer, int], Tuple[Any, int]]:
+    """ Make a reader for a single value, unpacked in place without copying it out of the buffer """
+    unpack_from = s.unpack_from
+    size = s.size
+    def read(buf: Buffer, pos: int) -> Tuple[Any, int]:
+        try:
+            return unpack_from(buf, pos)[0], pos + size
+        except struct.error:
+            raise EOFError() from None
+    return read
+
+_S_FLT4 = struct.Struct("<f")
+
+_buf_int2 = _buf_unpacker(struct.Struct("<H"))
+_buf_int4 = _buf_unpacker(struct.Struct("<I"))
+_buf_int8 = _buf_unpacker(struct.Struct("<Q"))
+_buf_sint8 = _buf_unpacker(struct.Struct("<q"))
+_buf_float4 = _buf_unpacker(_S_FLT4)
+
+def _buf_cstring(buf: Buffer, pos: int) -> Tuple[str, int]:
+    # find() is a memchr over the whole buffer, no need to read in chunks
+    end = buf.find(b'\0', pos)
+    if end < 0:
+        raise EOFError()
+    return buf[pos:end].decode("utf-8", "replace"), end + 1
 
-def _read_cstring(fd: BinaryIO) -> str:
-    return _read_until(fd, b'\0').decode("utf-8", "replace")
+def _buf_wstring(buf: Buffer, pos: int) -> Tuple[str, int]:
+    length, pos = _buf_int2(buf, pos)
+    cs, pos = _buf_exactly(buf, pos, length)
+    return cs.decode("utf-16"), pos
 
 
 #### Binary VDF parser
 class BinaryVdfParser:
-    # Type codes
-    T_SKEY = b'\x00'    # Subkey
-    T_CSTR = b'\x01'    # 0-delimited string
-    T_INT4 = b'\x02'    # 32-bit int
-    T_FLT4 = b'\x03'    # 32-bit float
-    T_PNTR = b'\x04'    # 32-bit pointer
-    T_WSTR = b'\x05'    # 0-delimited wide string
-    T_COLR = b'\x06'    # 32-bit color
-    T_INT8 = b'\x07'    # 64-bit int
-    T_END  = b'\x08'    # End of subkey
-    T_SIN8 = b'\x0A'    # 64-bit signed int
-    T_END2 = b'\x0B'    # Alternative end of subkey tag
+    # Type codes, compared as ints as that's what indexing a buffer yields
+    T_SKEY = 0x00   # Subkey
+    T_CSTR = 0x01   # 0-delimited string
+    T_INT4 = 0x02   # 32-bit int
+    T_FLT4 = 0x03   # 32-bit float
+    T_PNTR = 0x04   # 32-bit pointer
+    T_WSTR = 0x05   # 0-delimited wide string
+    T_COLR = 0x06   # 32-bit color
+    T_INT8 = 0x07   # 64-bit int
+    T_END  = 0x08   # End of subkey
+    T_SIN8 = 0x0A   # 64-bit signed int
+    T_END2 = 0x0B   # Alternative end of subkey tag
 
     # Unpack binary types
-    S_FLT4 = struct.Struct("<f")
+    S_FLT4 = _S_FLT4
+
+    # Scalar value readers by type code, called as reader(buf, pos) -> (value, pos)
+    _scalar_readers: Dict[int, Callable[[Buffer, int], Tuple[Union[str, int, float], int]]] = {
+        T_CSTR: _buf_cstring,
+        T_INT4: _buf_int4,
+        T_FLT4: _buf_float4,
+        T_PNTR: _buf_int4,
+        T_WSTR: _buf_wstring,
+        T_COLR: _buf_int4,
+        T_INT8: _buf_int8,
+        T_SIN8: _buf_sint8,
+    }
+
+    # Bound on the number of distinct keys remembered by a parser
+    KEY_CACHE_SIZE = 4096
 
     def __init__(self, factory=dict):
         self.factory = factory
-
-    def _read_map(self, fd: BinaryIO, key_table: Optional[List[str]]=None) -> DeepDict:
-        map = self.factory()
+        # The same few keys repeat in every map (e.g. for every app in appinfo.vdf),
+        # decode each once and share the resulting strings
+        self._key_cache: Dict[bytes, str] = {}
+
+    def _read_map(self, buf: Buffer, pos: int, key_table: Optional[List[str]]=None) -> Tuple[DeepDict, int]:
+        keys = []
+        values = []
+        T_SKEY = self.T_SKEY
+        T_END = self.T_END
+        T_END2 = self.T_END2
+        scalar_readers = self._scalar_readers
+        key_cache = self._key_cache
 
         while True:
-            t = fd.read(1)
-
-            if not t:
-                raise EOFError()
+            try:
+                t = buf[pos]
+            except IndexError:
+                raise EOFError() from None
+            pos += 1
 
-            if t in (self.T_END, self.T_END2):
-                return map
+            if t == T_END or t == T_END2:
+                return self.factory(zip(keys, values)), pos
 
             if key_table is not None:
-                key = key_table[_read_int(fd, 4)]
+                index, pos = _buf_int4(buf, pos)
+                key = key_table[index]
             else:
-                key = _read_cstring(fd)
-
-            value = self._read_value(fd, t, key_table=key_table)
-
-            map[key] = value
-
-    def _read_value(self, fd: BinaryIO, t: bytes, key_table: Optional[List[str]]=None) -> Union[str, int, float, DeepDict]:
-            if t == self.T_SKEY:
-                return self._read_map(fd, key_table=key_table)
-            elif t == self.T_CSTR:
-                return _read_cstring(fd)
-            elif t == self.T_WSTR:
-                length = _read_int(fd, 2)
-                return _read_exactly(fd, length).decode("utf-16")
-            elif t in (self.T_INT4, self.T_PNTR, self.T_COLR):
-                return _read_int(fd, 4)
-            elif t == self.T_INT8:
-                return _read_int(fd, 8)
-            elif t == self.T_SIN8:
-                return _read_int(fd, 8, True)
-            elif t == self.T_FLT4:
-                return _read_struct(fd, self.S_FLT4)[0]
+                end = buf.find(b'\0', pos)
+                if end < 0:
+                    raise EOFError()
+                raw = buf[pos:end]
+                pos = end + 1
+                key = key_cache.get(raw)
+                if key is None:
+                    key = raw.decode("utf-8", "replace")
+                    if len(key_cache) < self.KEY_CACHE_SIZE:
+                        key_cache[raw] = key
+
+            if t == T_SKEY:
+                value, pos = self._read_map(buf, pos, key_table=key_table)
             else:
-                raise ValueError("Unknown data type", fd.tell(), t)
+                try:
+                    reader = scalar_readers[t]
+                except KeyError:
+                    raise ValueError("Unknown data type", pos, t) from None
+                value, pos = reader(buf, pos)
+            keys.append(key)
+            values.append(value)
 
     def parse(self, fd: BinaryIO, key_table: Optional[List[str]]=None) -> DeepDict:
-        return self._read_map(fd, key_table=key_table)
+        data = fd.read()
+        map, end = self._read_map(data, 0, key_table=key_table)
+        # Leave the file positioned right after the map
+        fd.seek(end - len(data), io.SEEK_CUR)
+        return map
 
-    def parse_bytes(self, data: bytes, key_table: Optional[List[str]]=None) -> DeepDict:
-        with io.BytesIO(data) as fd:
-            return self.parse(fd, key_table=key_table)
+    def parse_bytes(self, data: Buffer, key_table: Optional[List[str]]=None, *, offset: int=0) -> DeepDict:
+        """
+        Parse a binary VDF map from a bytes-like object, e.g. a mmap
+        @param offset Where in data the map starts
+        """
+        return self._read_map(data, offset, key_table=key_table)[0]
 
 
 class AppInfoFile:
     S_APP_HEADER    = struct.Struct("<IIIIQ20sI")
     S_APP_HEADER_V2 = struct.Struct("<IIIIQ20sI20s")
 
-    file: BinaryIO
+    file: Union[BinaryIO, Buffer]
     parser: BinaryVdfParser
     key_table: Optional[List[str]]
 
     @classmethod
     def open(cls, filename) -> Self:
-        return cls(open(filename, "br"), close=True)
-
-    def __init__(self, file: BinaryIO, bvdf_parser=None, close=True):
+        """ Open an appinfo file, memory-mapping it so lookups are served from the page cache """
+        with open(filename, "br") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # mmap refuses empty files (let the index loader complain about those)
+                # and isn't supported everywhere. Read the whole file in one go instead
+                return cls(f.read(), close=False)
+        # Loading the index touches every app header, so start reading the whole file in right away
+        if hasattr(mmap, "MADV_WILLNEED"):
+            mm.madvise(mmap.MADV_WILLNEED)
+        return cls(mm, close=True)
+
+    def __init__(self, file: Union[BinaryIO, Buffer], bvdf_parser=None, close=True):
+        """
+        @param file The appinfo data, either as a binary file object or a bytes-like buffer such as a mmap
+        @param bvdf_parser The BinaryVdfParser to read app sections with
+        @param close Whether close() should also close file
+        """
         self.file = file
         self.parser = bvdf_parser if bvdf_parser is not None else BinaryVdfParser()
         self.key_table = None
         self._close_file = close
 
+    @cached_property
+    def _buffer(self) -> Buffer:
+        """ The file contents. Buffers are used directly, file objects are read into memory once """
+        if isinstance(self.file, (bytes, bytearray, mmap.mmap)):
+            return self.file
+        return self.file.read()
+
     def _load_offset(self, offset: int) -> DeepDict:
-        self.file.seek(offset, io.SEEK_SET)
-        return self.parser.parse(self.file, key_table=self.key_table)
+        return self.parser.parse_bytes(self._buffer, key_table=self.key_table, offset=offset)
 
     class App:
-        __slots__ = "appinfo", "offset", "id", "size", "state", "last_update", "token", "hash", "changeset", "hash_bin", "_data"
+        __slots__ = "appinfo", "offset", "id", "size", "state", "_last_update", "token", "hash", "changeset", "hash_bin", "_data"
 
         def __init__(self, appinfo,  offset, struct):
             self.id = struct[0]
             self.size = struct[1]
             self.state = struct[2]
-            self.last_update = datetime.datetime.fromtimestamp(struct[3])
+            self._last_update = struct[3]
             self.token = struct[4]
             self.hash = struct[5]
             self.changeset = struct[6]
@@ -404,6 +586,11 @@ class AppInfoFile:
             self.offset = offset
             self._data = None
 
+        @property
+        def last_update(self) -> datetime.datetime:
+            # Converted on access, most users never look at it
+            return datetime.datetime.fromtimestamp(self._last_update)
+
         def __repr__(self) -> str:
             return f"<{self.__class__.__qualname__}@{id(self):08x}: {self.id} @{self.offset:08x}>"
 
@@ -419,39 +606,24 @@ class AppInfoFile:
             return self._data
 
     def _read_string_table_from(self, offset: int) -> List[str]:
-        # preserve offset
-        _offset = self.file.tell()
-        self.file.seek(offset)
-        count = _read_int(self.file, 4)
-
-        stable: List[str] = []
-        rest: List[bytes] = []
-        buf = b''
-        for _ in range(count):
-            while (end := buf.find(b'\0')) < 0:
-                rest.append(buf)
-                buf = self.file.read(4096)
-                if not buf:
-                    raise EOFError()
-            if rest:
-                cs = b''.join((*rest, buf[:end]))
-                rest.clear()
-            else:
-                cs = buf[:end]
-            stable.append(cs.decode("utf-8"))
-            buf = buf[end+1:]
+        buf = self._buffer
+        count, pos = _buf_int4(buf, offset)
 
-        self.file.seek(_offset)
-        return stable
+        # The table runs to the end of the file, split it up in one go
+        strings = buf[pos:].split(b'\0', count)
+        if len(strings) <= count:
+            raise EOFError()
+        return [s.decode("utf-8") for s in strings[:count]]
 
     def _load_index(self) -> Tuple[int, Dict[int, App]]:
-        magic = _read_exactly(self.file, 4)
-        universe = _read_int(self.file, 4)
+        buf = self._buffer
+        magic, pos = _buf_exactly(buf, 0, 4)
+        universe, pos = _buf_int4(buf, pos)
 
         if magic == b"\x29\x44\x56\x07":
             header_struct = self.S_APP_HEADER_V2
             # read key table
-            kto = _read_int(self.file, 8)
+            kto, pos = _buf_int8(buf, pos)
             self.key_table = self._read_string_table_from(kto)
         elif magic == b"\x28\x44\x56\x07":
             header_struct = self.S_APP_HEADER_V2
@@ -461,20 +633,23 @@ class AppInfoFile:
             raise ValueError(f"Unknown appinfo.vdf magic {magic.hex()}")
 
         apps = {}
+        unpack_header = header_struct.unpack_from
+        header_size = header_struct.size
 
+        # Only the headers are read, skipping the app data is just arithmetic
         while True:
-            buf = self.file.read(header_struct.size)
-            if buf.startswith(b"\0\0\0\0"):
+            if buf[pos:pos+4] == b"\0\0\0\0":
                 break # Done
-            if len(buf) < header_struct.size:
-                raise EOFError()
-
-            struct = header_struct.unpack(buf)
-            appid, size, *_ = struct
+            try:
+                header = unpack_header(buf, pos)
+            except struct.error:
+                raise EOFError() from None
+            appid, size, *_ = header
 
-            apps[appid] = self.App(self, self.file.tell(), struct)
+            apps[appid] = self.App(self, pos + header_size, header)
 
-            self.file.seek(size - (header_struct.size - 8), io.SEEK_CUR)
+            # size counts everything after the appid and size fields
+            pos += 8 + size
 
         return universe, apps
 
@@ -491,6 +666,9 @@ class AppInfoFile:
     def __getitem__(self, key: int) -> App:
         return self.apps[key]
 
+    def __contains__(self, key: int) -> bool:
+        return key in self.apps
+
     def __iter__(self) -> Iterator[App]:
         return iter(self.apps.values())
 
@@ -502,6 +680,6 @@ class AppInfoFile:
         self.close()
 
     def close(self):
-        if self._close_file:
+        if self._close_file and hasattr(self.file, "close"):
             self.file.close()
 
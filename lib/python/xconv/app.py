@@ -25,15 +25,38 @@ xconv ffmpeg wrapper based on AdvancedAV
 """
 
 from .profileman import load_profile
-from .cmdline import parse_args, version
+from .cmdline import parse_args, version, usable_cpu_count
 
 import advancedav
 
-from os.path import isdir, join as build_path, basename, dirname, splitext, exists, abspath
-from os import environ, makedirs, mkdir
+from os.path import isdir, join as build_path, basename, dirname, splitext, split, abspath
+from os import environ, makedirs, mkdir, scandir, unlink
 from shutil import copyfile
 from pathlib import Path
 from functools import partial
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import sys
+
+
+# == Status output ==
+PROCESSING      = "\033[32m  Processing '%s'\033[0m\n"
+FINISHED        = "\033[32m  Finished '%s'\033[0m\n"
+FAILED          = "\033[31m  Failed '%s': %s\033[0m\n"
+APPLYING        = "\033[32m  Applying profile for '%s'\033[0m\033[K\r"
+APPLY_FAILED    = "\033[31m  Failed to apply profile for '%s'\033[0m\033[K\n"
+SKIP_OUTPUT     = "\033[33m  Skipping existing '%s' (--update)\033[0m\033[K\n"
+SKIP_TASK       = "\033[33m  Skipping task '%s' because no output files are left\033[0m\033[K\n"
+
+status_lock = Lock()
+
+def status(fmt, *args):
+    """
+    Write a per-task status line. Safe to call from worker threads.
+    """
+    with status_lock:
+        sys.stdout.write(fmt % args)
 
 
 # == Extend AAV ==
@@ -65,21 +88,22 @@ class AdvancedTask(XconvMixin, advancedav.Task):
 
 class Manager(advancedav.MultiAV):
     def _spawn_next(self, **b):
-        task = self.queue[0][1]
+        name = task_name(self.queue[0][1])
 
-        print("\033[32m  Processing '%s'\033[0m" % task_name(task))
+        status(PROCESSING, name)
+        sys.stdout.flush()
 
         proc, f = super()._spawn_next(**b)
 
-        f.then(partial(task_done, task)).catch(partial(task_fail, task))
+        f.then(partial(task_done, name)).catch(partial(task_fail, name))
 
         return proc, f
 
-def task_done(task, res):
-    print("\033[32m  Finished '%s'\033[0m" % task_name(task))
+def task_done(name, res):
+    status(FINISHED, name)
 
-def task_fail(task, exc):
-    print("\033[31m  Failed '%s': %s\033[0m" % (task_name(task), exc))
+def task_fail(name, exc):
+    status(FAILED, name, exc)
 
 
 # == App ==
@@ -89,20 +113,20 @@ def make_basename(path, infile):
 
 def make_outfile(path, infile, ext=None):
     name, oldext = splitext(basename(infile))
-    return build_path(path, ".".join((name, ext if ext else oldext)))
+    return build_path(path, name + ("." + ext if ext else oldext))
 
 
 def create_task(aav, profile, inputs, args, filename_from=None):
-    is_advanced_task_profile = any(("advanced_task" in profile.features,
-                                    "no_single_output" in profile.features))
+    features = profile.features
+    is_advanced_task_profile = "advanced_task" in features or "no_single_output" in features
 
     filename_from = filename_from or inputs[0]
 
     if not is_advanced_task_profile:
         fmt = None
         ext = None
-        if "output" in profile.features:
-            fmt, ext = profile.features["output"]
+        if "output" in features:
+            fmt, ext = features["output"]
         outfile = args.output if args.output_filename else make_outfile(args.output_directory, filename_from, ext)
         task = SimpleTask(aav, outfile, fmt)
 
@@ -143,12 +167,18 @@ def main(argv):
 
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
 
+    # Only look up the CPU count when it's actually needed
+    if args.concurrent is None:
+        args.concurrent = usable_cpu_count()
+
     profile = load_profile(args.profile)
+    features = profile.features
+    defines = profile.defines
 
     print("\033[36mXConv %s (c) Taeyeon Mori\033[0m" % version)
     print("\033[34mProfile: %s\033[0m" % args.profile)
 
-    unknown_defines = [n for n in args.define.keys() if n not in profile.defines]
+    unknown_defines = [n for n in args.define if n not in defines]
     if unknown_defines:
         print("\033[33mWarning: Unknown defines %s; see '%s -i %s' for avaliable defines in this profile\033[0m" %
               (", ".join(unknown_defines), argv[0], args.profile))
@@ -178,15 +208,17 @@ def main(argv):
         tasks.append(create_task(aav, profile, args.inputs, args))
 
     elif args.concat:
-        import tempfile, os
+        import tempfile
         tmp = tempfile.NamedTemporaryFile(mode="w", delete=False)
 
+        files = list(map(abspath, args.inputs))
+
         with tmp:
-            tmp.write("ffconcat version 1.0\n")
-            tmp.write("# XConv concat file\n")
-            for f in map(abspath, args.inputs):
-                print("\033[36m  Concatenating %s\033[0m" % basename(f))
-                tmp.write("file '%s'\n" % f)
+            tmp.write("ffconcat version 1.0\n# XConv concat file\n")
+            tmp.writelines(["file '%s'\n" % f for f in files])
+
+        for f in files:
+            print("\033[36m  Concatenating %s\033[0m" % basename(f))
 
         task = create_task(aav, profile, (), args, filename_from=args.inputs[0])
 
@@ -202,34 +234,70 @@ def main(argv):
 
     # Prepare profile parameters
     pkw = {}
-    if profile.defines:
+    if defines:
         pkw["defines"] = args.define
-    if profile.features:
-        if "argshax" in profile.features:
+    if features:
+        if "argshax" in features:
             pkw["args"] = args
 
     # Apply profile
-    for task in tasks:
-        print("\033[32m  Applying profile for '%s'\033[0m" % task_name(task), end="\033[K\r")
-        res = profile(task, **pkw)
+    def apply_profile(task):
+        status(APPLYING, task_name(task))
+        return profile(task, **pkw)
+
+    if args.parallel_profile and args.concurrent > 1 and len(tasks) > 1:
+        # Profiles usually probe their inputs, so let the ffprobe calls overlap.
+        # Opt-in, because profiles print their own messages without going through status()
+        with ThreadPoolExecutor(max_workers=args.concurrent) as executor:
+            results = list(executor.map(apply_profile, tasks))
+    else:
+        results = map(apply_profile, tasks)
+
+    failed = False
+    for task, res in zip(tasks, results):
         if not res:
-            print("\033[31m  Failed to apply profile for '%s'\033[0m\033[K" % task_name(task))
-            return 1
+            status(APPLY_FAILED, task_name(task))
+            failed = True
+
+    if failed:
+        return 1
 
     if args.update:
-        for task in tasks[:]:
-            for output in [o for o in task.outputs if exists(o.filename)]:
-                print("\033[33m  Skipping existing '%s' (--update)\033[0m\033[K" % output.name)
-                task.outputs.remove(output)
-            if not task.outputs:
-                print("\033[33m  Skipping task '%s' because no output files are left\033[0m\033[K" % task_name(task))
-                tasks.remove(task)
+        # Outputs mostly share a few directories; list each of them once
+        listings = {}
+
+        def output_exists(filename):
+            directory, name = split(filename)
+            try:
+                names = listings[directory]
+            except KeyError:
+                try:
+                    with scandir(directory or ".") as entries:
+                        names = listings[directory] = {entry.name for entry in entries}
+                except OSError:
+                    names = listings[directory] = set()
+            return name in names
+
+        remaining = []
+        for task in tasks:
+            outputs = []
+            for output in task.outputs:
+                if output_exists(output.filename):
+                    status(SKIP_OUTPUT, output.name)
+                else:
+                    outputs.append(output)
+            task.outputs[:] = outputs
+            if outputs:
+                remaining.append(task)
+            else:
+                status(SKIP_TASK, task_name(task))
+        tasks = remaining
 
     print("\033[35mExecuting Tasks..\033[0m\033[K")
 
     # Paralellize
     if args.concurrent > 1 and not args.merge and not args.concat:
-        tasks = sum([task.split(args.concurrent) for task in tasks], [])
+        tasks = list(chain.from_iterable(task.split(args.concurrent) for task in tasks))
 
     # Commit
         [t.commit2() for t in tasks]
@@ -238,12 +306,13 @@ def main(argv):
 
     else:
         for task in tasks:
-            print("\033[32m  Processing '%s'\033[0m" % task_name(task))
+            status(PROCESSING, task_name(task))
+            sys.stdout.flush()
             task.commit()
 
     # Clean up
     if args.concat:
-        os.unlink(tmp.name)
+        unlink(tmp.name)
 
     # Copy files
     if args.copy_files:
@@ -33,13 +33,39 @@ from advancedav import version_info as aav_version_info
 from argparse import ArgumentParser, Action
 from pathlib import Path
 from os.path import basename
-from multiprocessing import cpu_count
+from fnmatch import filter as fnfilter
+import os
 
 
 version = "%s (AdvancedAV %s)" % (".".join(map(str, version_info)), ".".join(map(str, aav_version_info)))
 
 
 # == Support code ==
+def usable_cpu_count():
+    """
+    Number of CPUs this process is allowed to run on
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def expand_globs(directory, names, patterns):
+    """
+    Expand glob patterns relative to directory
+
+    Simple patterns are matched against names, a listing of directory.
+    Patterns that span directories fall back to Path.glob
+    """
+    result = []
+    for pattern in patterns:
+        if "/" in pattern or "**" in pattern:
+            result.extend(directory.glob(pattern))
+        else:
+            result.extend(directory / name for name in fnfilter(names, pattern))
+    return result
+
+
 class TerminalAction(Action):
     def __init__(self, option_strings, dest, nargs=0, default=None, **kwargs):
         super().__init__(option_strings, dest, nargs=nargs, default=default or {}, **kwargs)
@@ -69,15 +95,16 @@ class ProfileInfoAction(TerminalAction):
             if output[0]:
                 output_info.append("Format: %s" % output[0])
             if output[1]:
-                output_info.append("File extension: %s" % output[0])
+                output_info.append("File extension: %s" % output[1])
             if output_info:
                 print("  Output: %s" % "; ".join(output_info))
         if profile.features:
-            print("  Flags: %s" % ", ".join("%s(%r)" % (k, v) if v is not None else k for k, v in profile.features.items()))
+            flags = ["%s(%r)" % (k, v) if v is not None else k for k, v in profile.features.items()]
+            print("  Flags: %s" % ", ".join(flags))
         if profile.defines:
             print("  Supported defines:")
-            for define in sorted(profile.defines.items()):
-                print("    %s: %s" % define)
+            for name, description in sorted(profile.defines.items()):
+                print("    %s: %s" % (name, description))
 
 
 class DefineAction(Action):
@@ -123,12 +150,13 @@ def parse_args(argv):
     # Available Options
     parser.add_argument("-v", "--verbose",              help="Enable verbose output",                                               action="store_true")
     parser.add_argument("-q", "--quiet",                help="Be less verbose",                                                     action="store_true")
-    parser.add_argument("-j", "--concurrent",           help="Run ffmpeg concurrently using at most N instances [%(default)s]", metavar="N", type=int, default=cpu_count())
+    parser.add_argument("-j", "--concurrent",           help="Run ffmpeg concurrently using at most N instances [usable CPUs]", metavar="N", type=int)
     profile = parser.add_argument_group("Profile")
     profile.add_argument("-l", "--list-profiles",       help="List profiles and quit",                                              action=ProfilesAction)
     profile.add_argument("-i", "--profile-info",        help="Give info about a profile and quit",          metavar="PROFILE",      action=ProfileInfoAction)
     profile.add_argument("-p", "--profile",             help="Specify the profile",                         metavar="PROFILE",      required=True)
     profile.add_argument("-D", "--define",              help="Define an option to be used by the profile",  metavar="NAME[=VALUE]", action=DefineAction)
+    profile.add_argument("-P", "--parallel-profile",    help="Apply the profile to up to -j tasks at once (profile messages may interleave)", action="store_true")
     mode = parser.add_argument_group("Mode").add_mutually_exclusive_group()
     mode.add_argument("-B", "--batch",                  help="Batch process every input file into an output file (default)",        action="store_true")
     mode.add_argument("-M", "--merge",                  help="Merge streams from all inputs",                                       action="store_true")
@@ -168,15 +196,15 @@ def parse_args(argv):
         if outdir.exists() and not outdir.is_dir():
             parser.error("--subdirectory only works with output directories. '%s' exists and isn't a directory")
 
-        inputs = args.inputs
-        args.inputs = []
-        for pattern in inputs:
-            args.inputs.extend(subdir.glob(pattern))
+        # List the directory once for all patterns
+        try:
+            with os.scandir(subdir) as entries:
+                names = [entry.name for entry in entries]
+        except FileNotFoundError:
+            names = []
 
-        files = args.copy_files
-        args.copy_files = []
-        for pattern in files:
-            args.copy_files.extend(subdir.glob(pattern))
+        args.inputs = expand_globs(subdir, names, args.inputs)
+        args.copy_files = expand_globs(subdir, names, args.copy_files or ())
 
         args.output_directory = args.output = outdir
         args.output_filename = None
@@ -122,10 +122,9 @@ def singleaudio(profile):
     """
     @wraps(profile)
     def wrapper(task, **kwds):
-        try:
-            audio_stream = next(task.iter_audio_streams())
-        except StopIteration:
-            print("No audio track in '%s'" % "', '".join(map(lambda x: x.name, task.inputs)))
+        audio_stream = next(task.iter_audio_streams(), None)
+        if audio_stream is None:
+            print("No audio track in '%s'" % "', '".join(x.name for x in task.inputs))
             return False
         return profile(task, stream=audio_stream, **kwds)
     __update(wrapper, "features", {"singleaudio": None})
@@ -26,13 +26,17 @@ xconv ffmpeg wrapper based on AdvancedAV
 from .profiles import __path__ as profilepaths
 
 from importlib import import_module
-from pathlib import Path
+from os import scandir
 
 
 # == Profile Index ==
 index = {}
 
+# Set once load_all_profiles() has imported every profile module
+_all_loaded = False
+
 profiles_package = __package__ + ".profiles"
+profiles_prefix = profiles_package + "."
 
 
 def make_qname(module, name):
@@ -40,18 +44,19 @@ def make_qname(module, name):
     Create a qualified name for a profile
     """
     # The global profiles package is omitted from the front
-    if module.startswith("%s." % profiles_package):
-        module = module[len(profiles_package) + 1:]
+    if module.startswith(profiles_prefix):
+        module = bare = module[len(profiles_prefix):]
     # But arbitrary packages can be specified by prepending :
     # This, among other things, allows to use profiles defined
     # in .py files in the working dir.
     else:
+        bare = module
         module = ":" + module
 
     # If it's not deeply nested and the module name
     # and profile name are the same, the latter
     # can be omitted.
-    if module.strip(":") != name:
+    if bare != name:
         return "%s.%s" % (module, name)
     else:
         return module
@@ -80,7 +85,7 @@ def load_profile(name):
         return index[name]
 
     # See if it's a qualified name
-    module = name.rsplit(".", 1)[0] if "." in name[1:] else name
+    module = name.rpartition(".")[0] if "." in name[1:] else name
 
     # Check if it's in the global profiles package or not
     if module[0] == ":":
@@ -96,7 +101,7 @@ def load_profile(name):
         return index[name]
     except KeyError:
         # Fully qualifying the global profiles package is technically valid.
-        if name.startswith(":%s." % profiles_package):
+        if name.startswith(":" + profiles_prefix):
             qname = make_qname(*name[1:].rsplit(".", 1))
             if qname in index:
                 return index[qname]
@@ -107,11 +112,21 @@ def load_all_profiles():
     """
     Load all profile definitions
     """
+    global _all_loaded
+
+    if _all_loaded:
+        return index
+
     for location in profilepaths:
-        for mod in (x for x in Path(location).iterdir() if x.is_file() and x.suffix == ".py"):
-            try:
-                import_module(".%s" % mod.stem, profiles_package)
-            except ImportError:
-                pass
+        with scandir(location) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".py") and entry.is_file():
+                    try:
+                        import_module("." + name[:-3], profiles_package)
+                    except ImportError:
+                        pass
+
+    _all_loaded = True
 
     return index
@@ -26,7 +26,6 @@ Opus Audiobook profile
 """
 
 import os
-import math
 
 from ..profile import *
 
@@ -38,8 +37,22 @@ abdefines = dict(
     ogg     = "Use the .ogg file extension (Currently required on Android)",
 )
 
-def apply_stream(stream, defines):
+def stream_options(defines, source):
+    """
+    Resolve the stream defines and source stream properties once per profile run
+
+    :return: (fancy, stereo, bitrate, source bitrate)
+    """
+    return ("fancy" in defines,
+            source.channels > 1 and "stereo" in defines,
+            defines.get("bitrate"),
+            source.bitrate)
+
+
+def apply_stream(stream, options):
     """ Apply the audiobook profile to an output stream """
+    fancy, stereo, bitrate, source_bitrate = options
+
     stream.codec = "libopus"
     stream.channels = 1
     stream.bitrate = 40_000
@@ -47,24 +60,25 @@ def apply_stream(stream, defines):
     stream.set(vbr="on", application="voip")
 
     # High Quality
-    if "fancy" in defines:
+    if fancy:
         stream.bitrate = 48_000
         stream.set(application="audio")
 
     # Stereo Options
-    if stream.source.channels > 1 and "stereo" in defines:
+    if stereo:
         stream.channels = 2
         stream.bitrate = 48_000
 
-        if "fancy" in defines:
+        if fancy:
             stream.bitrate = 64_000
 
     # Custom bitrate
-    if "bitrate" in defines:
-        stream.bitrate = defines["bitrate"]
+    if bitrate is not None:
+        stream.bitrate = bitrate
 
-    # Limit to input bitrate
-    stream.bitrate = min(stream.bitrate, stream.source.bitrate)
+    # Limit to input bitrate, if known
+    if source_bitrate and stream.bitrate > source_bitrate:
+        stream.bitrate = source_bitrate
 
 
 metadefines = dict(
@@ -92,7 +106,7 @@ def audiobook(task, stream, defines):
     if "ogg" in defines:
         task.change_format(ext="ogg")
 
-    apply_stream(task.map_stream(stream), defines)
+    apply_stream(task.map_stream(stream), stream_options(defines, stream))
 
     apply_metadata(task.output, defines)
 
@@ -109,24 +123,19 @@ def audiobook(task, stream, defines):
          **abdefines, **metadefines)
 @singleaudio
 def from_chapters(task, stream, defines):
-    # Read chapters from input
+    # Read chapters from input as (start, end, title)
+    # None leaves the respective mark unset
     if "ignore_ends" in defines:
         # Make sure nothing is cut out because of
         # broken chapter (end) markers
-        it = iter(task.iter_chapters())
-        first_chapter = next(it)
+        chapters = list(task.iter_chapters())
+        marks = [chapter.start_time for chapter in chapters[1:]]
 
-        chapters = [{"title": first_chapter.title}]
-
-        for chapter in it:
-            chapters[-1]["to"] = chapter.start_time
-            chapters.append({"ss": chapter.start_time,
-                             "title": chapter.title})
+        chapters = list(zip([None] + marks, marks + [None],
+                            (chapter.title for chapter in chapters)))
 
     else:
-        chapters = [{"ss": chapter.start_time,
-                     "to": chapter.end_time,
-                     "title": chapter.title}
+        chapters = [(chapter.start_time, chapter.end_time, chapter.title)
                     for chapter in task.iter_chapters()]
 
     # Output filenames
@@ -138,12 +147,17 @@ def from_chapters(task, stream, defines):
         fn_template = "%s - %%s.%s" % (task.output_prefix, ext)
 
     # Set up output files
-    for chapter in chapters:
-        out = task.add_output(fn_template % chapter.pop("title"), "ogg")
+    options = stream_options(defines, stream)
+
+    for ss, to, title in chapters:
+        out = task.add_output(fn_template % title, "ogg")
 
-        out.set(**chapter)
+        if ss is not None:
+            out.set(ss=ss)
+        if to is not None:
+            out.set(to=to)
 
-        apply_stream(out.map_stream(stream), defines)
+        apply_stream(out.map_stream(stream), options)
 
         apply_metadata(out, defines)
 
@@ -189,8 +203,9 @@ def audible(task, defines):
 
     ext = "ogg" if "ogg" in defines else "opus"
     chaps = len(input.chapters)
-    ct_fmt = "%%s %%0%dd - %%s.%s" % (math.ceil(math.log10(chaps)), ext)
+    ct_fmt = "%%s %%0%dd - %%s.%s" % (len(str(chaps)), ext)
     add_meta = {defines.get("artist_tag", "author"): input.artist}
+    options = stream_options(defines, audio)
     #album = defines.get("album", input.album)
 
     for chapter in input.chapters:
@@ -208,7 +223,7 @@ def audible(task, defines):
                  **add_meta)
         out.apply_meta(input.metadata, "copyright", "genre", "date", comment="description")
         out.apply_meta(defines, "performer", publisher="organization")
-        apply_stream(out.map_stream(audio), defines)
+        apply_stream(out.map_stream(audio), options)
         #if not "dont_embed_cover" in defines:
         #    out.map_stream(cover) # Not sure how to make ffmpeg add covers to ogg
 
@@ -233,20 +248,22 @@ def explode(task, stream, defines):
 
     ext = "ogg" if "ogg" in defines else "opus"
 
+    options = stream_options(defines, stream)
+
     if npieces > 1:
         fn_template = "%s - %%02i.%s" % (task.output_prefix, ext)
-        out = task.add_output(fn_template % 1, "ogg")
 
-        for i in range(1, npieces):
-            ts = i * interval
-            out.set(to=ts)
+        # The first piece starts at the beginning, the last one runs until the end
+        for i in range(npieces):
             out = task.add_output(fn_template % (i + 1), "ogg")
-            out.set(ss=ts)
+            if i > 0:
+                out.set(ss=i * interval)
+            if i < npieces - 1:
+                out.set(to=(i + 1) * interval)
+            apply_stream(out.map_stream(stream), options)
 
     else:
-        task.add_output("%s.%s" % (task.output_prefix, ext), "ogg")
-
-    for out in task.outputs:
-        apply_stream(out.map_stream(stream), defines)
+        out = task.add_output("%s.%s" % (task.output_prefix, ext), "ogg")
+        apply_stream(out.map_stream(stream), options)
 
     return True
@@ -33,9 +33,11 @@ from ..profile import *
 @defines(format="Convert all subtitles to a specific format")
 @features(no_single_output=True)
 def getsubs(task, defines):
+    input_index = {f: i for i, f in enumerate(task.inputs)}
+    fmt = defines.get("format")
     for stream in task.iter_subtitle_streams():
-        of = task.add_output("%s.%s.%s.%s" % (task.output_prefix, task.inputs.index(stream.file), stream.pertype_index, stream.codec), None) # TODO get real file extension
+        of = task.add_output("%s.%s.%s.%s" % (task.output_prefix, input_index[stream.file], stream.pertype_index, stream.codec), None) # TODO get real file extension
         os = of.map_stream(stream)
-        if "format" in defines:
-        	os.codec = defines["format"]
+        if fmt is not None:
+            os.codec = fmt
     return True
@@ -1,19 +1,21 @@
 from ..profile import *
 
+from itertools import chain
+
 
 @profile
 @description("First Video H.264 Main fastdecode animation, max 1280x800; Audio AAC; Keep subtitles")
 @output(container="matroska", ext="mkv")
 def laptop(task):
     # add first video stream
-    for s in task.iter_video_streams():
+    s = next(task.iter_video_streams(), None)
+    if s is not None:
         (task.map_stream(s)
             .set(codec="libx264",
                 tune=("fastdecode", "animation"),
                 profile="main",
                 preset="fast")
             .downscale(1280, 800))
-        break
     # Add all audio streams (reencode to aac if necessary)
     for s in task.iter_audio_streams():
         os = task.map_stream(s)